@@ -4,22 +4,102 @@ Icarus Fandom Wiki Database Scraper
 Comprehensive scraper for https://icarus.fandom.com/
 
 Installation:
-pip install requests beautifulsoup4 lxml
+pip install requests lxml brotli orjson
+pip install polars   # optional, adds icarus_data/items.parquet
 
 Usage:
-python RecipeScraping.py
+python RecipeScraping.py [--yes] [--workers N] [--rate R] [--rediscover] [--force]
 """
 
-import json
+import io
+import multiprocessing
 import os
 import re
+import sqlite3
 import time
+import zlib
+from contextlib import closing
+from functools import lru_cache
+import orjson
 import requests
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import quote, unquote
+from lxml import etree, html as lxml_html
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from threading import Lock
 
 BASE_URL = "https://icarus.fandom.com"
+API_URL = f"{BASE_URL}/api.php"
+
+class ThrottleAwareRetry(Retry):
+    """Retry policy that turns one thread's 429/503 into a pause for all of them
+    
+    urllib3 already sleeps for Retry-After before retrying, but only in the
+    thread that got the response; the other workers would keep hitting the
+    throttled wiki. Pausing the shared RATE_LIMITER holds them too.
+    """
+    
+    def sleep(self, response=None):
+        if response is not None and response.status in (429, 503):
+            RATE_LIMITER.pause(self.get_retry_after(response) or THROTTLE_PAUSE)
+        super().sleep(response)
+
+# Back-off when the wiki throttles without saying for how long
+THROTTLE_PAUSE = 5
+
+# Per-batch discovery chatter and per-page fetch errors; set SCRAPE_DEBUG=1
+# to see them
+DEBUG = bool(os.environ.get('SCRAPE_DEBUG'))
+
+# One client for the whole run so connections to the wiki are reused.
+# requests advertises and decodes brotli automatically when the `brotli`
+# package is installed, which Fandom prefers over gzip.
+SESSION = requests.Session()
+SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+})
+# Everything goes to one host, so one pool sized for the scraper threads;
+# transient errors are retried with backoff instead of losing the page.
+# Five retries, backing off 0+1+2+4+8s, enough to ride out a brief wiki outage.
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=32,
+    max_retries=ThrottleAwareRetry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Conditional-GET validators and last parsed item per URL, kept in output_dir
+HTTP_CACHE_FILE = ".http_cache.json"
+
+# Parsed items between saves of the HTTP cache during a scrape
+CHECKPOINT_EVERY = 100
+
+# Items confirmed current within this long are reused without any request,
+# not even the touched-timestamp check; --force checks every page again
+ITEM_MAX_AGE = 86400
+
+# Raw HTML of every fetched page (zlib-compressed, SQLite), kept in output_dir
+PAGE_CACHE_FILE = ".page_cache.sqlite"
+
+# Bump whenever a change alters what parse_html produces. Cached items
+# record the version that parsed them; after a bump, unchanged pages are
+# re-parsed from the page cache instead of reusing the old parser's items.
+PARSER_VERSION = 2
+
+# Result of the last category crawl, kept in output_dir; category listings
+# change far less often than item pages, so it is reused for a week
+DISCOVERY_CACHE_FILE = ".discovery_cache.json"
+DISCOVERY_MAX_AGE = 7 * 86400
+
+# Item pages are ~100-300 KB; anything far bigger is not an item page
+MAX_PAGE_BYTES = 2_000_000
+
+# MediaWiki always serves UTF-8; saying so up front skips encoding detection.
+# Comments and processing instructions (parser reports, cache markers) are
+# dropped while parsing instead of becoming tree nodes, and nothing looks
+# elements up by id, so the id table isn't built either.
+HTML_PARSER_OPTIONS = dict(encoding='utf-8', remove_comments=True, remove_pis=True, collect_ids=False)
+HTML_PARSER = lxml_html.HTMLParser(**HTML_PARSER_OPTIONS)
 
 # Known category pages on Fandom
 CATEGORY_URLS = {
@@ -37,155 +117,297 @@ CATEGORY_URLS = {
 
 counter_lock = Lock()
 
+# MediaWiki namespace number of Category: pages
+CATEGORY_NAMESPACE = 14
+
+# Wiki namespaces that never hold item articles (talk pages, files, user
+# pages, templates...); checked on the page title before anything is fetched
+SKIP_PREFIXES = (
+    'Category:', 'Category_talk:', 'Talk:', 'File:', 'File_talk:',
+    'Template:', 'Template_talk:', 'Module:', 'Special:', 'User:',
+    'User_talk:', 'User_blog:', 'Message_Wall:', 'MediaWiki:', 'Help:', 'Forum:'
+)
+
+def is_article_url(page_url):
+    """True unless the page lives in one of the SKIP_PREFIXES namespaces"""
+    return not page_url.split('/wiki/', 1)[-1].startswith(SKIP_PREFIXES)
+
+def canonical_url(href):
+    """Absolute page URL with one spelling per wiki title
+    
+    Drops fragments/query strings and re-encodes the title the way MediaWiki
+    does, so links like `Iron_Pickaxe#Crafting` or `Archer's_Backpack` and
+    `Archer%27s_Backpack` all map to the same page.
+    """
+    
+    # Handle both relative and absolute URLs
+    if href.startswith('http'):
+        full_url = href
+    elif href.startswith('/'):
+        full_url = BASE_URL + href
+    else:
+        full_url = BASE_URL + '/' + href
+    
+    full_url = full_url.split('#')[0].split('?')[0]
+    base, sep, title = full_url.partition('/wiki/')
+    if not sep:
+        return full_url
+    
+    title = quote(unquote(title).replace(' ', '_'), safe=";@$!*(),/~:")
+    return f"{base}/wiki/{title}"
+
+def page_title(page_url):
+    """Wiki page title for an article URL, e.g. .../wiki/Stone_Axe -> 'Stone Axe'"""
+    return unquote(page_url.split('/wiki/', 1)[1]).replace('_', ' ')
+
+def title_url(title):
+    """Canonical article URL for a wiki title, e.g. 'Stone Axe' -> .../wiki/Stone_Axe"""
+    return canonical_url('/wiki/' + quote(title.replace(' ', '_')))
+
+class TokenBucket:
+    """Thread-safe token bucket: allows short bursts while holding an average rate"""
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate            # tokens added per second
+        self.capacity = capacity    # maximum burst size
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = Lock()
+    
+    def consume(self, tokens=1):
+        """Block until `tokens` are available, then take them"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.updated:
+                    # Paused: nothing accrues until the pause ends
+                    wait = self.updated - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    
+                    if self.tokens >= tokens:
+                        self.tokens -= tokens
+                        return
+                    
+                    wait = (tokens - self.tokens) / self.rate
+            
+            time.sleep(wait)
+    
+    def set_rate(self, rate, capacity=None):
+        """Change the average rate (and burst size, by default two seconds' worth)"""
+        if not rate > 0:
+            raise ValueError(f"rate must be greater than 0, got {rate}")
+        with self.lock:
+            self.rate = rate
+            self.capacity = capacity if capacity is not None else max(1, 2 * rate)
+            self.tokens = min(self.tokens, self.capacity)
+    
+    def pause(self, seconds):
+        """Stop handing out tokens for `seconds`, then restart from an empty bucket"""
+        with self.lock:
+            self.tokens = 0
+            self.updated = max(self.updated, time.monotonic() + seconds)
+
+# Shared by every thread that talks to the wiki; consume() before each real request
+RATE_LIMITER = TokenBucket(rate=5, capacity=10)
+
+def iter_capped(response):
+    """Decoded body chunks of a streamed response, raising ValueError past MAX_PAGE_BYTES"""
+    
+    # Content-Length is the compressed size, so exceeding the cap there
+    # means the decoded page would too; reject before reading the body
+    if int(response.headers.get('Content-Length') or 0) > MAX_PAGE_BYTES:
+        raise ValueError(f"page larger than {MAX_PAGE_BYTES:,} bytes")
+    
+    total = 0
+    for chunk in response.iter_content(chunk_size=65536):
+        total += len(chunk)
+        if total > MAX_PAGE_BYTES:
+            raise ValueError(f"page larger than {MAX_PAGE_BYTES:,} bytes")
+        yield chunk
+
+def fetch_tree(page_url):
+    """GET a page and parse it while it downloads; returns the lxml root
+    
+    Decoded (gzip/brotli) chunks go straight into a feed parser, so the
+    full body is never held as one bytes object.
+    """
+    
+    parser = lxml_html.HTMLParser(**HTML_PARSER_OPTIONS)
+    
+    RATE_LIMITER.consume()
+    with SESSION.get(page_url, timeout=30, stream=True) as response:
+        response.raise_for_status()
+        for chunk in iter_capped(response):
+            parser.feed(chunk)
+    
+    return parser.close()
+
 def get_category_members(category_url, max_pages=20):
-    """Get all pages from a Fandom category, including subcategories"""
+    """Get the item pages and subcategories listed directly in a Fandom category
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
+    Reads the MediaWiki categorymembers API: up to 500 members per request
+    as compact JSON, following the API's continuation token, instead of
+    paging through the rendered category page 200 links at a time.
+    
+    Runs on discovery worker threads, so progress is printed as whole lines
+    tagged with the category name. Subcategories are returned rather than
+    followed; discover_all_item_pages queues each one once.
+    """
     
+    category_name = category_url.split('Category:')[-1]
     all_pages = set()
     subcategories = set()
-    current_url = category_url
-    visited = set()
+    params = {
+        'action': 'query',
+        'list': 'categorymembers',
+        'cmtitle': page_title(category_url),
+        'cmtype': 'page|subcat',
+        'cmlimit': 'max',
+        'format': 'json',
+        'formatversion': 2
+    }
     
     for page_num in range(max_pages):
-        if current_url in visited:
-            break
-            
-        visited.add(current_url)
-        
-        print(f"   Fetching page {page_num + 1}...", end=' ')
-        
         try:
-            response = requests.get(current_url, headers=headers, timeout=30)
+            RATE_LIMITER.consume()
+            response = SESSION.get(API_URL, params=params, timeout=30)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'lxml')
-            
-            # Find category members - Fandom uses specific div classes
-            category_content = soup.find('div', class_='category-page__members')
+            data = response.json()
             
             members_found = 0
-            if category_content:
-                # Find all links to wiki pages
-                for link in category_content.find_all('a', class_='category-page__member-link'):
-                    href = link.get('href', '')
-                    if href and '/wiki/' in href:
-                        # Handle both relative and absolute URLs
-                        if href.startswith('http'):
-                            full_url = href
-                        elif href.startswith('/'):
-                            full_url = BASE_URL + href
-                        else:
-                            full_url = BASE_URL + '/' + href
-                        
-                        # Check if it's a subcategory or an item
-                        if 'Category:' in full_url:
-                            subcategories.add(full_url)
-                        elif not any(x in full_url for x in ['File:', 'Special:', 'User:', 'Talk:']):
-                            all_pages.add(full_url)
-                            members_found += 1
+            for member in data.get('query', {}).get('categorymembers', []):
+                full_url = title_url(member['title'])
+                
+                # Check if it's a subcategory or an item
+                if member['ns'] == CATEGORY_NAMESPACE:
+                    subcategories.add(full_url)
+                elif is_article_url(full_url):
+                    all_pages.add(full_url)
+                    members_found += 1
             
-            print(f"✓ Found {members_found} items")
+            if DEBUG:
+                print(f"   [{category_name}] batch {page_num + 1}: ✓ Found {members_found} items")
             
-            # Look for "next page" link in pagination
-            next_link = soup.find('a', class_='category-page__pagination-next')
-            if next_link and next_link.get('href'):
-                next_href = next_link['href']
-                # Handle both relative and absolute URLs
-                if next_href.startswith('http'):
-                    current_url = next_href
-                elif next_href.startswith('/'):
-                    current_url = BASE_URL + next_href
-                else:
-                    current_url = BASE_URL + '/' + next_href
-            else:
+            # More members: repeat the query with the continuation parameters
+            if 'continue' not in data:
                 break
+            params.update(data['continue'])
                 
         except Exception as e:
-            print(f"✗ Error: {str(e)[:100]}")
-            print(f"   Problem URL: {current_url}")
+            print(f"   [{category_name}] batch {page_num + 1}: ✗ Error: {str(e)[:100]}")
             break
-        
-        time.sleep(0.5)
     
-    # Recursively get subcategories
-    if subcategories:
-        print(f"   Found {len(subcategories)} subcategories, crawling...")
-        for subcat_url in subcategories:
-            subcat_name = subcat_url.split('Category:')[-1]
-            print(f"   → Subcategory: {subcat_name}")
-            subcat_pages, _ = get_category_members(subcat_url, max_pages=10)
-            all_pages.update(subcat_pages)
+    if DEBUG and subcategories:
+        print(f"   [{category_name}] Found {len(subcategories)} subcategories")
     
     return list(all_pages), list(subcategories)
 
-def discover_all_item_pages():
-    """Phase 1: Discover all item pages from categories"""
+def get_main_page_links(page_url):
+    """Item links from the content area of a main database page (Items, Weapons...)"""
+    
+    page_name = page_url.split('/wiki/')[-1]
+    found_pages = set()
+    
+    try:
+        tree = fetch_tree(page_url)
+        
+        # Find all wiki links in content area (not just tables)
+        links = tree.xpath(f"(//div[{has_class('mw-parser-output')}])[1]//a/@href")
+        if links:
+            for href in links:
+                if '/wiki/' in href:
+                    full_url = canonical_url(href)
+                    
+                    # Only add if it looks like an item page (not a main page)
+                    path = full_url.split('/wiki/')[-1]
+                    if path and is_article_url(full_url) and path not in ['Items', 'Weapons', 'Tools', 'Armor', 'Resources', 'Crafting']:
+                        found_pages.add(full_url)
+        
+        print(f"   {page_name}: ✓ {len(found_pages)} items")
+    except Exception as e:
+        print(f"   {page_name}: ✗ Error: {str(e)[:50]}")
+    
+    return found_pages
+
+def load_discovery_cache(cache_path):
+    """Page list from a previous discovery if younger than DISCOVERY_MAX_AGE, else None"""
+    try:
+        with open(cache_path, 'rb') as f:
+            cache = orjson.loads(f.read())
+        if time.time() - cache['discovered_at'] < DISCOVERY_MAX_AGE:
+            return cache['pages']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+def discover_all_item_pages(max_workers=5, cache_path=None, refresh=False):
+    """Phase 1: Discover all item pages from categories
+    
+    Categories are crawled concurrently, subcategories included; the shared
+    RATE_LIMITER keeps the combined request rate polite. With a cache_path, a discovery result
+    from the last few days is reused instead of re-crawling every category
+    listing, unless refresh is set.
+    """
     
     print("="*70)
     print("PHASE 1: DISCOVERING ITEM PAGES FROM CATEGORIES")
     print("="*70)
     
-    all_item_pages = set()
+    if cache_path and not refresh:
+        cached_pages = [url for url in load_discovery_cache(cache_path) or [] if is_article_url(url)]
+        if cached_pages:
+            print(f"\n♻️  Reusing {len(cached_pages)} pages discovered in the last "
+                  f"{DISCOVERY_MAX_AGE // 86400} days (--rediscover to crawl again)")
+            return cached_pages
     
-    for category_name, category_url in CATEGORY_URLS.items():
-        print(f"\n📂 Scanning category: {category_name}")
-        print(f"   URL: {category_url}")
-        
-        pages, subcats = get_category_members(category_url)
-        
-        if pages:
-            all_item_pages.update(pages)
-            print(f"   ✓ Total found: {len(pages)} pages")
-        else:
-            print(f"   ✗ No pages found")
-        
-        time.sleep(0.5)
+    all_item_pages = set()
     
     # Also try to find item lists from main pages
-    print(f"\n📂 Scanning main database pages...")
     main_pages = [
-        (f"{BASE_URL}/wiki/Items", "Items"),
-        (f"{BASE_URL}/wiki/Weapons", "Weapons"),
-        (f"{BASE_URL}/wiki/Tools", "Tools"),
-        (f"{BASE_URL}/wiki/Armor", "Armor"),
-        (f"{BASE_URL}/wiki/Resources", "Resources"),
+        f"{BASE_URL}/wiki/Items",
+        f"{BASE_URL}/wiki/Weapons",
+        f"{BASE_URL}/wiki/Tools",
+        f"{BASE_URL}/wiki/Armor",
+        f"{BASE_URL}/wiki/Resources",
     ]
     
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-    
-    for page_url, page_name in main_pages:
-        try:
-            print(f"   Checking {page_name}...", end=' ')
-            response = requests.get(page_url, headers=headers, timeout=30)
-            soup = BeautifulSoup(response.content, 'lxml')
-            
-            found_count = 0
-            # Find all wiki links in content area (not just tables)
-            content = soup.find('div', class_='mw-parser-output')
-            if content:
-                for link in content.find_all('a', href=True):
-                    href = link['href']
-                    if '/wiki/' in href and not any(x in href for x in ['Category:', 'File:', 'Special:', 'Talk:', 'User:']):
-                        # Handle both relative and absolute URLs
-                        if href.startswith('http'):
-                            full_url = href
-                        elif href.startswith('/'):
-                            full_url = BASE_URL + href
-                        else:
-                            full_url = BASE_URL + '/' + href
-                        
-                        # Only add if it looks like an item page (not a main page)
-                        path = full_url.split('/wiki/')[-1]
-                        if path and path not in ['Items', 'Weapons', 'Tools', 'Armor', 'Resources', 'Crafting']:
-                            all_item_pages.add(full_url)
-                            found_count += 1
-            
-            print(f"✓ {found_count} items")
-            time.sleep(0.5)
-        except Exception as e:
-            print(f"✗ Error: {str(e)[:50]}")
+    print(f"\n📂 Scanning {len(CATEGORY_URLS)} categories and {len(main_pages)} main database pages "
+          f"with {max_workers} threads...")
+    # Breadth-first over the category tree. Only this thread queues work, so
+    # a subcategory shared by several parents (Items contains Weapons,
+    # Tools...) or reachable through a cycle is crawled exactly once, and
+    # no worker ever waits on another's crawl. The main pages share the
+    # pool, so they fill the gaps while the last subcategories finish.
+    seen_categories = set(CATEGORY_URLS.values())
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {
+            executor.submit(get_category_members, category_url): category_name
+            for category_name, category_url in CATEGORY_URLS.items()
+        }
+        main_page_futures = [executor.submit(get_main_page_links, page_url) for page_url in main_pages]
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                category_name = pending.pop(future)
+                pages, subcats = future.result()
+                
+                if pages:
+                    all_item_pages.update(pages)
+                    print(f"   ✓ {category_name}: {len(pages)} pages")
+                else:
+                    print(f"   ✗ {category_name}: No pages found")
+                
+                for subcat_url in subcats:
+                    if subcat_url not in seen_categories:
+                        seen_categories.add(subcat_url)
+                        subcat_future = executor.submit(get_category_members, subcat_url, max_pages=10)
+                        pending[subcat_future] = subcat_url.split('Category:')[-1]
+        
+        for future in main_page_futures:
+            all_item_pages.update(future.result())
     
     print(f"\n{'='*70}")
     print(f"✓ PHASE 1 COMPLETE")
@@ -193,70 +415,231 @@ def discover_all_item_pages():
     print(f"Total unique pages discovered: {len(all_item_pages)}")
     
     # Save discovered URLs
-    with open('discovered_pages.json', 'w') as f:
-        json.dump(sorted(list(all_item_pages)), f, indent=2)
+    save_json('discovered_pages.json', sorted(all_item_pages))
     print(f"💾 Saved to discovered_pages.json")
     
+    if cache_path:
+        write_atomic(cache_path, orjson.dumps({"discovered_at": time.time(), "pages": sorted(all_item_pages)}))
+    
     return list(all_item_pages)
 
-def extract_infobox_data(soup):
+# Crafting-station phrases, highest priority first. Each is searched on its
+# own: in a single alternation, a higher-priority phrase that fails the
+# sanity checks would consume the text of a lower-priority one inside it.
+CRAFT_STATION_PATTERNS = (
+    re.compile(r'Crafted (?:at|in|using)[:\s]+([^.\n]+)', re.IGNORECASE),
+    re.compile(r'(?:Made|Built|Created) at[:\s]+([^.\n]+)', re.IGNORECASE),
+    re.compile(r'Requires[:\s]+([A-Z][a-zA-Z\s]+(?:Bench|Station|Furnace|Forge))', re.IGNORECASE),
+    re.compile(r'Station[:\s]+([^.\n]+)', re.IGNORECASE),
+)
+
+def has_class(name):
+    """XPath predicate matching one entry of a space-separated class attribute"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def text_of(element, separator=''):
+    """lxml equivalent of BeautifulSoup's get_text(separator, strip=True)"""
+    return separator.join(t.strip() for t in element.itertext() if t.strip())
+
+def has_class_token(element, name):
+    """Python side of has_class(), for elements already in hand"""
+    return name in element.get('class', '').split()
+
+# Every page-level node parse_html needs (title, article body, infoboxes,
+# tables, category links) in one document walk rather than one per lookup.
+# The class tests are cheap substring pre-filters; scan_page confirms the
+# exact class on the few nodes that come back.
+PAGE_LANDMARKS = etree.XPath(
+    "/descendant::h1[contains(@class, 'page-header__title')]"
+    " | /descendant::div[contains(@class, 'mw-parser-output')]"
+    " | /descendant::aside[contains(@class, 'portable-infobox')]"
+    " | /descendant::table"
+    " | /descendant::a[contains(@href, '/wiki/Category:')]"
+)
+
+# Item-page queries, compiled once rather than re-parsing the expression
+# string on every call for every table and row
+TABLE_HEADERS = etree.XPath('.//th')
+TABLE_ROWS = etree.XPath('.//tr')
+ROW_CELLS = etree.XPath('.//td')
+RECIPE_TABLE_WORDS = re.compile('craft|recipe|materials|required|ingredients')
+
+# Per-row/per-cell patterns for recipe tables and lists
+WHOLE_NUMBER = re.compile(r'^(\d+)$')
+FIRST_NUMBER = re.compile(r'(\d+)')
+LEADING_COUNT = re.compile(r'^\d+\s*[×x]?\s*')
+TRAILING_COUNT = re.compile(r'\s*[×x]?\s*\d+$')
+COUNTED_ITEM = re.compile(r'^(\d+)\s*(.+)$')
+STATION_NAME_RE = re.compile(r'([A-Z][a-zA-Z\s]+(?:Bench|Station|Furnace|Forge|Fabricator|Printer))')
+PREREQUISITE_RE = re.compile(r'Prerequisite[:\s]+([A-Z][a-zA-Z\s]+(?:Bench|Station|Furnace|Forge))')
+INFOBOX_LABELS = etree.XPath(f".//*[{has_class('pi-data-label')}] | .//tr/th")
+# The value for a label: its pi-data-value sibling (portable infobox) or
+# the next cell in the row (classic infobox table)
+LABEL_VALUE = etree.XPath(
+    f"(following-sibling::div[{has_class('pi-data-value')}][1] | following-sibling::td[1])[1]"
+)
+# Portable-infobox horizontal groups put the labels in a header row and each
+# value in the same column of the row below, so the label has no sibling value
+GROUP_VALUE = etree.XPath(
+    f"ancestor::table[{has_class('pi-horizontal-group')}][1]//tr[td][1]/td[$column]"
+)
+# Infobox rows/blocks whose text mentions crafting, filtered inside libxml2
+# instead of lower-casing every nested div's text in Python
+_LOWER_TEXT = "translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+_MENTIONS_CRAFTING = " or ".join(f"contains({_LOWER_TEXT}, '{word}')" for word in ('craft', 'station', 'made'))
+INFOBOX_CRAFTING_ROWS = etree.XPath(f".//div[{_MENTIONS_CRAFTING}] | .//tr[{_MENTIONS_CRAFTING}]")
+
+@lru_cache(maxsize=4096)
+def normalize_label(text):
+    """Lowercased label text; the same few labels recur on every page"""
+    return text.strip().lower()
+
+@lru_cache(maxsize=4096)
+def infobox_field(key):
+    """Which item field a normalized infobox label feeds, or None"""
+    if 'tier' in key:
+        return 'tier'
+    for stat in ('damage', 'armor', 'weight', 'durability'):
+        if stat in key:
+            return stat
+    if 'type' in key or 'category' in key:
+        return 'category'
+    return None
+
+def scan_page(tree):
+    """Sort PAGE_LANDMARKS into (title, content, infobox, tables, category_links)
+    
+    title and content are the first matching h1/div, or None. The infobox
+    is the Fandom portable infobox, or a classic infobox table on older
+    pages. Tables and category links are in document order.
+    """
+    
+    title = content = None
+    infoboxes = []
+    tables = []
+    category_links = []
+    
+    for element in PAGE_LANDMARKS(tree):
+        tag = element.tag
+        if tag == 'a':
+            category_links.append(element)
+        elif tag == 'table':
+            tables.append(element)
+            if has_class_token(element, 'infobox'):
+                infoboxes.append(element)
+        elif tag == 'aside':
+            if has_class_token(element, 'portable-infobox'):
+                infoboxes.append(element)
+        elif tag == 'div':
+            if content is None and has_class_token(element, 'mw-parser-output'):
+                content = element
+        elif title is None and has_class_token(element, 'page-header__title'):
+            title = element
+    
+    portable = [el for el in infoboxes if el.tag == 'aside']
+    infobox = (portable or infoboxes or [None])[0]
+    
+    return title, content, infobox, tables, category_links
+
+def extract_infobox_data(infobox):
     """Extract data from Fandom infobox"""
     
     infobox_data = {}
     
-    # Find infobox (common class names in Fandom)
-    infobox = soup.find('aside', class_='portable-infobox') or soup.find('table', class_='infobox')
-    
-    if infobox:
-        # Extract all data rows
-        for row in infobox.find_all(['div', 'tr']):
-            # Look for label-value pairs
-            label_elem = row.find(['h3', 'th', 'div'], class_=re.compile('label|header'))
-            value_elem = row.find(['div', 'td'], class_=re.compile('value|data'))
-            
-            if label_elem and value_elem:
-                label = label_elem.get_text(strip=True)
-                value = value_elem.get_text(strip=True)
-                
+    if infobox is not None:
+        # One compiled XPath pass for all labels, one sibling step per value
+        for label_elem in INFOBOX_LABELS(infobox):
+            value_elem = LABEL_VALUE(label_elem)
+            if not value_elem and label_elem.tag == 'th':
+                column = sum(1 for _ in label_elem.itersiblings('th', preceding=True)) + 1
+                value_elem = GROUP_VALUE(label_elem, column=column)
+
+            if value_elem:
+                label = text_of(label_elem)
+                value = text_of(value_elem[0])
+
                 if label and value:
-                    infobox_data[label.lower()] = value
-    
+                    infobox_data[normalize_label(label)] = value
+
     return infobox_data
 
-def parse_crafting_table(soup, page_text):
+def extract_description(content):
+    """First paragraph of the article that reads like a description, cleaned up; None if none does"""
+    
+    if content is None:
+        return None
+    
+    # Get only the first actual paragraph, skip empty ones
+    for p in content.findall('p'):
+        # Use separator=' ' to preserve spaces between elements
+        desc = text_of(p, ' ')
+        
+        # Only use paragraphs that are actual descriptions (not too short, not infobox text)
+        if not desc or len(desc) <= 20 or len(desc) >= 500:
+            continue
+        
+        # Skip if it looks like infobox data (has lots of category/stat words)
+        if DESCRIPTION_STAT_WORDS.search(desc):
+            continue
+        
+        # Remove reference links like "can be viewedhere" or "see here" at the end
+        desc = DESCRIPTION_LIST_LINK.sub('', desc)
+        desc = DESCRIPTION_SEE_HERE.sub('', desc)
+        desc = DESCRIPTION_VIEWED_HERE.sub('', desc)
+        # Remove any trailing "here." or "here" at the end of sentences
+        desc = DESCRIPTION_TRAILING_HERE.sub('.', desc)
+        # Clean up multiple spaces
+        desc = WHITESPACE_RUN.sub(' ', desc)
+        
+        return desc.strip()
+    
+    return None
+
+def item_type_from_categories(category_links):
+    """Item type implied by the page's wiki categories, 'unknown' if none match"""
+    
+    categories = [normalize_label(text_of(cat_link)) for cat_link in category_links]
+    
+    for word, item_type in (('weapon', 'weapon'), ('armor', 'armor'), ('tool', 'tool'),
+                            ('consumable', 'consumable'), ('resource', 'resource')):
+        if any(word in cat for cat in categories):
+            return item_type
+    
+    return 'unknown'
+
+def parse_crafting_table(tables, content, infobox, page_text):
     """Extract crafting recipe from tables and text"""
 
     ingredients = {}
     crafted_at = "Unknown"
 
     # Method 1: Look for crafting tables with Amount/Resource structure (Fandom Wiki format)
-    for table in soup.find_all('table'):
-        table_text = table.get_text().lower()
-
+    for table in tables:
         # Check if it's a crafting/recipe table by looking for common headers
-        headers = table.find_all(['th'])
-        header_text = ' '.join([h.get_text().lower().strip() for h in headers])
+        headers = TABLE_HEADERS(table)
+        header_text = ' '.join([h.text_content().lower().strip() for h in headers])
 
+        # The whole-table text is only built when the headers are inconclusive
         is_recipe_table = (
             ('amount' in header_text and 'resource' in header_text) or
             ('material' in header_text and 'quantity' in header_text) or
             ('quantity' in header_text) or
             ('amount' in header_text) or
-            any(word in table_text for word in ['craft', 'recipe', 'materials', 'required', 'ingredients'])
+            RECIPE_TABLE_WORDS.search(table.text_content().lower()) is not None
         )
 
         if is_recipe_table:
-            rows = table.find_all('tr')
+            rows = TABLE_ROWS(table)
 
             # Detect column order from headers
             quantity_first = True  # Default: Amount | Resource
             if headers:
-                first_header = headers[0].get_text().lower().strip() if len(headers) > 0 else ''
+                first_header = headers[0].text_content().lower().strip() if len(headers) > 0 else ''
                 if 'material' in first_header or 'resource' in first_header or 'item' in first_header:
                     quantity_first = False  # Material | Quantity order
 
             for row in rows:
-                cells = row.find_all(['td'])
+                cells = ROW_CELLS(row)
 
                 # Skip header rows (only th cells) or rows without enough cells
                 if len(cells) < 2:
@@ -270,27 +653,27 @@ def parse_crafting_table(soup, page_text):
                     resource_cell = cells[0]
                     quantity_cell = cells[1]
 
-                quantity_text = quantity_cell.get_text(strip=True)
-                quantity_match = re.search(r'^(\d+)$', quantity_text.strip())
+                quantity_text = text_of(quantity_cell)
+                quantity_match = WHOLE_NUMBER.search(quantity_text.strip())
 
                 if quantity_match:
                     quantity = int(quantity_match.group(1))
 
                     # Try to find a link with actual text (not just an image)
                     item_name = ""
-                    for link in resource_cell.find_all('a'):
-                        link_text = link.get_text(strip=True)
+                    for link in resource_cell.iterdescendants('a'):
+                        link_text = text_of(link)
                         if link_text and len(link_text) > 0:
                             item_name = link_text
                             break
 
                     # Fallback to cell text if no valid link found
                     if not item_name:
-                        item_name = resource_cell.get_text(strip=True)
+                        item_name = text_of(resource_cell)
 
                     # Clean up item name
-                    item_name = re.sub(r'^\d+\s*[×x]?\s*', '', item_name).strip()
-                    item_name = re.sub(r'\s*[×x]?\s*\d+$', '', item_name).strip()
+                    item_name = LEADING_COUNT.sub('', item_name).strip()
+                    item_name = TRAILING_COUNT.sub('', item_name).strip()
 
                     if len(item_name) > 1 and quantity > 0:
                         # Avoid duplicates - keep the first occurrence
@@ -305,22 +688,22 @@ def parse_crafting_table(soup, page_text):
 
     # Method 1b: Alternative table format - Resource | Amount (columns swapped)
     if not ingredients:
-        for table in soup.find_all('table'):
-            rows = table.find_all('tr')
+        for table in tables:
+            rows = TABLE_ROWS(table)
 
             for row in rows:
-                cells = row.find_all(['td'])
+                cells = ROW_CELLS(row)
 
                 if len(cells) >= 2:
                     # Try resource first, then amount
                     resource_cell = cells[0]
                     quantity_cell = cells[1]
 
-                    link = resource_cell.find('a')
-                    if link:
-                        item_name = link.get_text(strip=True)
-                        quantity_text = quantity_cell.get_text(strip=True)
-                        quantity_match = re.search(r'(\d+)', quantity_text)
+                    link = next(resource_cell.iterdescendants('a'), None)
+                    if link is not None:
+                        item_name = text_of(link)
+                        quantity_text = text_of(quantity_cell)
+                        quantity_match = FIRST_NUMBER.search(quantity_text)
 
                         if quantity_match and item_name:
                             quantity = int(quantity_match.group(1))
@@ -335,22 +718,21 @@ def parse_crafting_table(soup, page_text):
 
     # Method 2: Look for ingredients in lists (format: "5Wood", "4Leather", etc.)
     if not ingredients:
-        content = soup.find('div', class_='mw-parser-output')
-        if content:
-            for ul in content.find_all(['ul', 'ol']):
-                for li in ul.find_all('li'):
-                    li_text = li.get_text(strip=True)
+        if content is not None:
+            for ul in content.iterdescendants('ul', 'ol'):
+                for li in ul.iterdescendants('li'):
+                    li_text = text_of(li)
 
                     # Look for pattern: number followed by item name (no space)
-                    match = re.match(r'^(\d+)\s*(.+)$', li_text)
+                    match = COUNTED_ITEM.match(li_text)
                     if match:
                         quantity = int(match.group(1))
 
                         # Try to get item name from link
-                        links = li.find_all('a')
+                        links = li.iterdescendants('a')
                         item_name = ""
                         for link in links:
-                            link_text = link.get_text(strip=True)
+                            link_text = text_of(link)
                             if link_text and len(link_text) > 1:
                                 item_name = link_text
                                 break
@@ -368,60 +750,210 @@ def parse_crafting_table(soup, page_text):
                     break
 
     # Method 3: Look for text patterns for crafting station
-    craft_patterns = [
-        r'Crafted (?:at|in|using)[:\s]+([^.\n]+)',
-        r'(?:Made|Built|Created) at[:\s]+([^.\n]+)',
-        r'Requires[:\s]+([A-Z][a-zA-Z\s]+(?:Bench|Station|Furnace|Forge))',
-        r'Station[:\s]+([^.\n]+)',
-    ]
-    
-    for pattern in craft_patterns:
-        match = re.search(pattern, page_text, re.IGNORECASE)
+    for pattern in CRAFT_STATION_PATTERNS:
+        match = pattern.search(page_text)
         if match:
             station = match.group(1).strip()
             # Clean up the station name
-            station = re.sub(r'\s+', ' ', station)
+            station = WHITESPACE_RUN.sub(' ', station)
             if len(station) < 50 and any(word in station.lower() for word in ['bench', 'station', 'furnace', 'forge', 'fabricator', 'printer']):
                 crafted_at = station
                 break
     
     # Method 3: Look in infobox for crafting station
     if crafted_at == "Unknown":
-        infobox = soup.find('aside', class_='portable-infobox') or soup.find('table', class_='infobox')
-        if infobox:
-            for row in infobox.find_all(['div', 'tr']):
-                row_text = row.get_text().lower()
-                if 'craft' in row_text or 'station' in row_text or 'made' in row_text:
-                    value = row.get_text(strip=True)
-                    # Extract station name
-                    for word in ['bench', 'station', 'furnace', 'forge', 'fabricator', 'printer']:
-                        if word in value.lower():
-                            # Extract the full station name
-                            match = re.search(r'([A-Z][a-zA-Z\s]+(?:Bench|Station|Furnace|Forge|Fabricator|Printer))', value)
-                            if match:
-                                crafted_at = match.group(1).strip()
-                                break
-                    if crafted_at != "Unknown":
-                        break
+        if infobox is not None:
+            for row in INFOBOX_CRAFTING_ROWS(infobox):
+                value = text_of(row)
+                # Extract station name
+                for word in ['bench', 'station', 'furnace', 'forge', 'fabricator', 'printer']:
+                    if word in value.lower():
+                        # Extract the full station name
+                        match = STATION_NAME_RE.search(value)
+                        if match:
+                            crafted_at = match.group(1).strip()
+                            break
+                if crafted_at != "Unknown":
+                    break
     
     # Method 4: Look for "Prerequisite" section which often contains crafting station
-    prereq_match = re.search(r'Prerequisite[:\s]+([A-Z][a-zA-Z\s]+(?:Bench|Station|Furnace|Forge))', page_text)
+    prereq_match = PREREQUISITE_RE.search(page_text)
     if prereq_match and crafted_at == "Unknown":
         crafted_at = prereq_match.group(1).strip()
     
     return ingredients, crafted_at
 
-def extract_item_data(page_url, quiet=True):
-    """Extract comprehensive item data from a Fandom wiki page"""
+def write_atomic(filepath, data):
+    """Write bytes through a temporary file, so a crash never leaves a truncated file"""
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, filepath)
+
+def load_http_cache(filepath):
+    """Load the per-URL validator cache; a missing or corrupt file means empty"""
+    try:
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+def save_http_cache(filepath, cache):
+    """Persist the validator cache (compact: it holds a copy of every item)"""
+    write_atomic(filepath, orjson.dumps(cache))
+
+def fetch_html(page_url, cached=None):
+    """Download a wiki page (network I/O only)
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
+    Returns (final_url, html_bytes, validators); final_url differs from
+    page_url when the wiki redirected, e.g. from an old item name.
+    
+    With a `cached` entry from the HTTP cache the request is conditional;
+    if the page is unchanged the server answers 304 and html_bytes is None.
+    """
+    
+    headers = {}
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    
+    RATE_LIMITER.consume()
+    with SESSION.get(page_url, headers=headers, timeout=30, stream=True) as response:
+        response.raise_for_status()
+        
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
+        if response.status_code == 304:
+            return canonical_url(response.url), None, validators
+        
+        return canonical_url(response.url), b''.join(iter_capped(response)), validators
+
+def fetch_touched(page_urls, batch_size=50):
+    """Last-touched timestamp and resolved title of each page, from the MediaWiki API
+    
+    One api.php request covers up to 50 titles, so checking every page for
+    changes costs a few dozen requests instead of one GET per page.
+    Redirects are followed, so a redirecting URL reports its target's
+    title and timestamp. Pages the API can't answer for are simply left out.
+    Returns (touched, targets), both keyed by URL.
+    """
+    
+    page_urls = list(page_urls)
+    touched = {}
+    targets = {}
+    
+    for start in range(0, len(page_urls), batch_size):
+        batch = {page_title(url): url for url in page_urls[start:start + batch_size]}
+        
+        RATE_LIMITER.consume()
+        try:
+            response = SESSION.get(API_URL, params={
+                'action': 'query',
+                'prop': 'info',
+                'redirects': 1,
+                'titles': '|'.join(batch),
+                'format': 'json',
+                'formatversion': 2
+            }, timeout=15)
+            response.raise_for_status()
+            query = response.json().get('query', {})
+        except (requests.RequestException, ValueError):
+            continue
+        
+        normalized = {n['from']: n['to'] for n in query.get('normalized', [])}
+        redirects = {r['from']: r['to'] for r in query.get('redirects', [])}
+        page_touched = {page['title']: page.get('touched') for page in query.get('pages', [])}
+        
+        for title, url in batch.items():
+            title = normalized.get(title, title)
+            title = redirects.get(title, title)
+            if page_touched.get(title):
+                touched[url] = page_touched[title]
+                targets[url] = title
+    
+    return touched, targets
+
+def open_page_cache(filepath):
+    """Open (creating if needed) the page cache for writing from this thread"""
+    db = sqlite3.connect(filepath)
+    # Parser processes read while the main thread writes
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, html BLOB NOT NULL)')
+    return db
+
+def store_page(db, page_url, html):
+    db.execute('INSERT OR REPLACE INTO pages VALUES (?, ?)', (page_url, zlib.compress(html)))
+
+def load_page(filepath, page_url):
+    """Stored HTML for page_url, or None; uses its own connection, so any process can call it"""
+    with closing(sqlite3.connect(filepath)) as db:
+        row = db.execute('SELECT html FROM pages WHERE url = ?', (page_url,)).fetchone()
+    return zlib.decompress(row[0]) if row else None
+
+def parse_cached_page(cache_path, page_url, final_url):
+    """parse_html over the stored copy of a page (runs in a parser process)"""
+    return parse_html(final_url, load_page(cache_path, page_url))
+
+# Fandom's site-wide footer element, which follows all per-page content
+GLOBAL_FOOTER_TAG = re.compile(rb'<footer\b[^>]*\bclass="(?:[^"]*\s)?global-footer[\s"]')
+CONTENT_MARKER = b'mw-parser-output'
+
+def global_footer_start(html):
+    """Offset of the global footer element, or None if the page should not be cut
+    
+    Searched from the end, so the class name showing up earlier in an
+    inline script or config blob is never mistaken for it; a footer that
+    doesn't come after the article content is ignored too.
+    """
+    start = html.rfind(b'<footer')
+    while start >= 0:
+        if GLOBAL_FOOTER_TAG.match(html, start):
+            return start if start > html.rfind(CONTENT_MARKER) else None
+        start = html.rfind(b'<footer', 0, start)
+    return None
+
+def keyword_pattern(*words):
+    """Compile words into one alternation that finds any of them as a substring
+    
+    Same matches as `any(word in text for word in words)`, but the text is
+    scanned once by the regex engine instead of once per word.
+    """
+    return re.compile('|'.join(re.escape(word) for word in words))
+
+# Page-text patterns, compiled once at import instead of per page
+DESCRIPTION_STAT_WORDS = re.compile(r'(Category|Statistics|Weight|Durability|Attributes|Prerequisites)')
+DESCRIPTION_LIST_LINK = re.compile(r'\s*A list of [^.]+can be viewed\s*here\.?\s*$', re.IGNORECASE)
+DESCRIPTION_SEE_HERE = re.compile(r'\s*[Ss]ee\s+here\.?\s*$')
+DESCRIPTION_VIEWED_HERE = re.compile(r'\s*[Vv]iewed?\s*here\.?\s*$')
+DESCRIPTION_TRAILING_HERE = re.compile(r'\s+here\.?\s*$')
+WHITESPACE_RUN = re.compile(r'\s+')
+HARVEST_LOCATION_RE = re.compile(r'(?:harvested|found|gathered) (?:from|in|at)\s+([^.]+)', re.IGNORECASE)
+LOCATION_SEPARATOR = re.compile(r',|and')
+RESEARCH_COST_RE = re.compile(r'research.*?cost.*?(\d+)', re.IGNORECASE)
+PURCHASE_COST_RE = re.compile(r'(?:crafting|purchase|cost|price).*?(?:cost)?.*?(\d+)', re.IGNORECASE)
+# Matched against the lower-cased page text
+HARVEST_WORDS = keyword_pattern('harvested', 'foraged', 'gathered', 'mined')
+# Phrases that indicate it's a workshop item
+WORKSHOP_PHRASES = keyword_pattern(
+    'purchased from the workshop',
+    'crafted in the workshop',
+    'researched and then crafted in the workshop',
+    'unlocked in the workshop',
+    'purchased and equipped'
+)
+ORBITAL_WORDS = keyword_pattern('exotic', 'orbital')
+
+def new_item_data(page_url):
+    """Empty item record for a page, used before parsing or when a fetch fails"""
     
     # Extract item name from URL
     item_name = page_url.split('/wiki/')[-1].replace('_', ' ')
     
-    item_data = {
+    return {
         "name": item_name,
         "url": page_url,
         "description": "",
@@ -439,160 +971,152 @@ def extract_item_data(page_url, quiet=True):
             "crafted_at": "Unknown"
         }
     }
+
+def parse_html(page_url, html):
+    """Extract comprehensive item data from a downloaded wiki page (CPU only)
     
-    try:
-        response = requests.get(page_url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'lxml')
+    Kept free of network access and shared state so it can run in a
+    separate process.
+    """
+    
+    item_data = new_item_data(page_url)
+    
+    # Everything used below (title, article, infobox, category footer) comes
+    # before Fandom's site-wide footer; the footer, right rail scripts and
+    # tracking markup after it are a sizeable share of the page, so they are
+    # cut off before parsing instead of being built into the tree
+    footer_start = global_footer_start(html)
+    if footer_start is not None:
+        html = html[:footer_start]
+    
+    # Raw lxml instead of BeautifulSoup: every lookup below runs in libxml2
+    # rather than through bs4's per-node Python wrappers
+    tree = lxml_html.document_fromstring(html, parser=HTML_PARSER)
+    etree.strip_elements(tree, 'script', 'style', with_tail=False)
+    title_elem, content, infobox, tables, category_links = scan_page(tree)
+    
+    # Get page title
+    if title_elem is not None:
+        item_data['name'] = text_of(title_elem)
+    
+    # Extract description from first paragraph
+    description = extract_description(content)
+    if description is not None:
+        item_data['description'] = description
+    
+    # Extract infobox data
+    infobox_data = extract_infobox_data(infobox)
+    
+    # Parse infobox fields
+    for key, value in infobox_data.items():
+        field = infobox_field(key)
         
-        # Get page title
-        title_elem = soup.find('h1', class_='page-header__title')
-        if title_elem:
-            item_data['name'] = title_elem.get_text(strip=True)
+        if field == 'tier':
+            tier_match = FIRST_NUMBER.search(value)
+            if tier_match:
+                item_data['tier'] = int(tier_match.group(1))
         
-        # Extract description from first paragraph - FIXED
-        content = soup.find('div', class_='mw-parser-output')
-        if content:
-            # Get only the first actual paragraph, skip empty ones
-            for p in content.find_all('p', recursive=False):
-                # Use separator=' ' to preserve spaces between elements
-                desc = p.get_text(separator=' ', strip=True)
-                
-                # Only use paragraphs that are actual descriptions (not too short, not infobox text)
-                if desc and len(desc) > 20 and len(desc) < 500:
-                    # Skip if it looks like infobox data (has lots of category/stat words)
-                    if not re.search(r'(Category|Statistics|Weight|Durability|Attributes|Prerequisites)', desc):
-                        # Clean up the description - FIXED
-                        # Remove reference links like "can be viewedhere" or "see here" at the end
-                        desc = re.sub(r'\s*A list of [^.]+can be viewed\s*here\.?\s*$', '', desc, flags=re.IGNORECASE)
-                        desc = re.sub(r'\s*[Ss]ee\s+here\.?\s*$', '', desc)
-                        desc = re.sub(r'\s*[Vv]iewed?\s*here\.?\s*$', '', desc)
-                        # Remove any trailing "here." or "here" at the end of sentences
-                        desc = re.sub(r'\s+here\.?\s*$', '.', desc)
-                        # Clean up multiple spaces
-                        desc = re.sub(r'\s+', ' ', desc)
-                        
-                        item_data['description'] = desc.strip()
-                        break
-        
-        # Extract infobox data
-        infobox_data = extract_infobox_data(soup)
-        
-        # Parse infobox fields
-        for key, value in infobox_data.items():
-            if 'tier' in key:
-                tier_match = re.search(r'(\d+)', value)
-                if tier_match:
-                    item_data['tier'] = int(tier_match.group(1))
-            
-            elif 'damage' in key:
-                item_data['stats']['damage'] = value
-            
-            elif 'armor' in key:
-                item_data['stats']['armor'] = value
-            
-            elif 'weight' in key:
-                item_data['stats']['weight'] = value
-            
-            elif 'durability' in key:
-                item_data['stats']['durability'] = value
-            
-            elif 'type' in key or 'category' in key:
-                item_data['category'] = value.lower()
+        elif field == 'category':
+            item_data['category'] = value.lower()
         
-        # Get full page text for pattern matching
-        page_text = soup.get_text()
+        elif field:
+            item_data['stats'][field] = value
+    
+    # Text for pattern matching: only the article body and the infobox, not
+    # the navigation/footer chrome around them. text_content() keeps the
+    # newlines the patterns use as terminators.
+    page_text = content.text_content() if content is not None else ''
+    if infobox is not None and content not in infobox.iterancestors():
+        page_text += '\n' + infobox.text_content()
+
+    # Extract crafting recipe
+    ingredients, crafted_at = parse_crafting_table(tables, content, infobox, page_text)
+    
+    if ingredients:
+        item_data['ingredients'] = ingredients
+        item_data['base_recipe']['ingredients'] = ingredients
+        if item_data['item_type'] == 'unknown':
+            item_data['item_type'] = 'craftable'
+    
+    if crafted_at != "Unknown":
+        item_data['crafted_at'] = crafted_at
+        item_data['base_recipe']['crafted_at'] = crafted_at
+        if item_data['item_type'] == 'unknown':
+            item_data['item_type'] = 'craftable'
+    
+    page_text_lower = page_text.lower()
+    
+    # Look for harvesting info
+    if HARVEST_WORDS.search(page_text_lower):
+        item_data['item_type'] = 'harvestable'
         
-        # Extract crafting recipe
-        ingredients, crafted_at = parse_crafting_table(soup, page_text)
+        # Try to extract locations
+        harvest_match = HARVEST_LOCATION_RE.search(page_text)
+        if harvest_match:
+            locations = harvest_match.group(1).strip()
+            item_data['harvested_from'] = [loc.strip() for loc in LOCATION_SEPARATOR.split(locations)]
+    
+    # Look for orbital/workshop info
+    is_workshop_item = False
+    
+    # Check for workshop/orbital keywords
+    if 'workshop' in page_text_lower:
+        if WORKSHOP_PHRASES.search(page_text_lower):
+            is_workshop_item = True
+        elif ORBITAL_WORDS.search(page_text_lower):
+            is_workshop_item = True
+    
+    if is_workshop_item:
+        # Try to extract research cost
+        research_match = RESEARCH_COST_RE.search(page_text)
+        if research_match:
+            item_data['research_cost'] = int(research_match.group(1))
+            item_data['item_type'] = 'orbital'
         
-        if ingredients:
-            item_data['ingredients'] = ingredients
-            item_data['base_recipe']['ingredients'] = ingredients
+        # Try to extract purchase/crafting cost  
+        purchase_match = PURCHASE_COST_RE.search(page_text)
+        if purchase_match and not research_match:  # Don't double-count research cost
+            item_data['purchase_cost'] = int(purchase_match.group(1))
             if item_data['item_type'] == 'unknown':
-                item_data['item_type'] = 'craftable'
+                item_data['item_type'] = 'orbital'
         
-        if crafted_at != "Unknown":
-            item_data['crafted_at'] = crafted_at
-            item_data['base_recipe']['crafted_at'] = crafted_at
+        # If we found workshop phrases but no costs, still mark as workshop
+        if not item_data['research_cost'] and not item_data['purchase_cost']:
+            item_data['crafted_at'] = 'Workshop'
+            item_data['base_recipe']['crafted_at'] = 'Workshop'
             if item_data['item_type'] == 'unknown':
-                item_data['item_type'] = 'craftable'
-        
-        # Look for harvesting info
-        if any(word in page_text.lower() for word in ['harvested', 'foraged', 'gathered', 'mined']):
-            item_data['item_type'] = 'harvestable'
-            
-            # Try to extract locations
-            harvest_match = re.search(r'(?:harvested|found|gathered) (?:from|in|at)\s+([^.]+)', page_text, re.IGNORECASE)
-            if harvest_match:
-                locations = harvest_match.group(1).strip()
-                item_data['harvested_from'] = [loc.strip() for loc in re.split(r',|and', locations)]
-        
-        # Look for orbital/workshop info
-        is_workshop_item = False
-        
-        # Check for workshop/orbital keywords
-        if 'workshop' in page_text.lower():
-            # Look for phrases that indicate it's a workshop item
-            workshop_phrases = [
-                'purchased from the workshop',
-                'crafted in the workshop',
-                'researched and then crafted in the workshop',
-                'unlocked in the workshop',
-                'purchased and equipped'
-            ]
-            
-            if any(phrase in page_text.lower() for phrase in workshop_phrases):
-                is_workshop_item = True
-            elif 'exotic' in page_text.lower() or 'orbital' in page_text.lower():
-                is_workshop_item = True
-        
-        if is_workshop_item:
-            # Try to extract research cost
-            research_match = re.search(r'research.*?cost.*?(\d+)', page_text, re.IGNORECASE)
-            if research_match:
-                item_data['research_cost'] = int(research_match.group(1))
                 item_data['item_type'] = 'orbital'
-            
-            # Try to extract purchase/crafting cost  
-            purchase_match = re.search(r'(?:crafting|purchase|cost|price).*?(?:cost)?.*?(\d+)', page_text, re.IGNORECASE)
-            if purchase_match and not research_match:  # Don't double-count research cost
-                item_data['purchase_cost'] = int(purchase_match.group(1))
-                if item_data['item_type'] == 'unknown':
-                    item_data['item_type'] = 'orbital'
-            
-            # If we found workshop phrases but no costs, still mark as workshop
-            if not item_data['research_cost'] and not item_data['purchase_cost']:
-                item_data['crafted_at'] = 'Workshop'
-                item_data['base_recipe']['crafted_at'] = 'Workshop'
-                if item_data['item_type'] == 'unknown':
-                    item_data['item_type'] = 'orbital'
-        
-        # Determine type from categories
-        categories = []
-        for cat_link in soup.find_all('a', href=re.compile(r'/wiki/Category:')):
-            cat_name = cat_link.get_text(strip=True).lower()
-            categories.append(cat_name)
-        
-        if item_data['item_type'] == 'unknown':
-            if any('weapon' in cat for cat in categories):
-                item_data['item_type'] = 'weapon'
-            elif any('armor' in cat for cat in categories):
-                item_data['item_type'] = 'armor'
-            elif any('tool' in cat for cat in categories):
-                item_data['item_type'] = 'tool'
-            elif any('consumable' in cat for cat in categories):
-                item_data['item_type'] = 'consumable'
-            elif any('resource' in cat for cat in categories):
-                item_data['item_type'] = 'resource'
-        
-        return item_data
-        
+    
+    # Determine type from categories, unless the page text already did
+    if item_data['item_type'] == 'unknown':
+        item_data['item_type'] = item_type_from_categories(category_links)
+    
+    return item_data
+
+def extract_item_data(page_url, quiet=not DEBUG):
+    """Fetch and parse a single Fandom wiki page"""
+    
+    try:
+        final_url, html, _ = fetch_html(page_url)
+        return parse_html(final_url, html)
     except Exception as e:
         if not quiet:
             print(f"  [ERROR] {page_url}: {e}")
-        return item_data
+        return new_item_data(page_url)
+
+# Name keywords used by categorize_items
+FURNITURE_KEYWORDS = keyword_pattern('bench', 'table', 'chair', 'bed', 'furnace', 'forge', 'station', 'storage', 'chest', 'fabricator', 'printer')
+STRUCTURE_KEYWORDS = keyword_pattern('wall', 'floor', 'roof', 'ramp', 'door', 'window', 'stairs', 'foundation', 'pillar', 'beam', 'corner', 'ceiling')
+AMMUNITION_KEYWORDS = keyword_pattern('bullet', 'shell', 'arrow', 'ammo', 'cartridge', 'round')
+MELEE_KEYWORDS = keyword_pattern('knife', 'spear', 'sword', 'axe', 'pickaxe', 'machete', 'blade', 'hammer')
+RANGED_KEYWORDS = keyword_pattern('bow', 'rifle', 'pistol', 'shotgun', 'gun', 'crossbow')
+ARMOR_KEYWORDS = keyword_pattern('armor', 'helmet', 'boots', 'gloves', 'suit', 'vest')
+TOOL_KEYWORDS = keyword_pattern('drill', 'saw', 'wrench', 'scanner', 'lantern', 'torch', 'radar')
+FOOD_KEYWORDS = keyword_pattern('meat', 'fish', 'berry', 'berries', 'bread', 'soup', 'stew', 'cooked', 'raw', 'food')
+MEDICINE_KEYWORDS = keyword_pattern('medicine', 'bandage', 'paste', 'cure', 'antibiotic', 'syringe')
+RAW_RESOURCE_KEYWORDS = keyword_pattern('ore', 'wood', 'stone', 'fiber', 'hide', 'bone', 'stick')
+PROCESSED_RESOURCE_KEYWORDS = keyword_pattern('ingot', 'refined', 'leather', 'rope', 'fabric', 'steel', 'iron', 'copper')
+DEPLOYABLE_KEYWORDS = keyword_pattern('turret', 'trap', 'beacon', 'mine', 'deployable')
 
 def categorize_items(items):
     """Intelligently categorize items"""
@@ -617,8 +1141,6 @@ def categorize_items(items):
     for item in items:
         name_lower = item['name'].lower()
         item_type = item.get('item_type', 'unknown')
-        category = item.get('category', '').lower()
-        desc_lower = item.get('description', '').lower()
         
         categorized = False
         
@@ -628,69 +1150,70 @@ def categorize_items(items):
             categorized = True
         
         # Building - Furniture (benches, stations, etc.) - CHECK THIS FIRST
-        if not categorized and any(word in name_lower for word in ['bench', 'table', 'chair', 'bed', 'furnace', 'forge', 'station', 'storage', 'chest', 'fabricator', 'printer']):
+        if not categorized and FURNITURE_KEYWORDS.search(name_lower):
             categories['building_furniture'].append(item)
             categorized = True
         
         # Building - Structures (walls, floors, roofs, etc.)
-        if not categorized and any(word in name_lower for word in ['wall', 'floor', 'roof', 'ramp', 'door', 'window', 'stairs', 'foundation', 'pillar', 'beam', 'corner', 'ceiling']):
+        if not categorized and STRUCTURE_KEYWORDS.search(name_lower):
             categories['building_structures'].append(item)
             categorized = True
         
         # Ammunition
-        if not categorized and any(word in name_lower for word in ['bullet', 'shell', 'arrow', 'ammo', 'cartridge', 'round']):
+        if not categorized and AMMUNITION_KEYWORDS.search(name_lower):
             categories['ammunition'].append(item)
             categorized = True
         
         # Weapons - Melee
-        if not categorized and any(word in name_lower for word in ['knife', 'spear', 'sword', 'axe', 'pickaxe', 'machete', 'blade', 'hammer']):
+        if not categorized and MELEE_KEYWORDS.search(name_lower):
             if 'arrow' not in name_lower:
                 categories['weapons_melee'].append(item)
                 categorized = True
         
         # Weapons - Ranged
-        if not categorized and any(word in name_lower for word in ['bow', 'rifle', 'pistol', 'shotgun', 'gun', 'crossbow']):
+        if not categorized and RANGED_KEYWORDS.search(name_lower):
             categories['weapons_ranged'].append(item)
             categorized = True
         
         # Armor
-        if not categorized and (item_type == 'armor' or any(word in name_lower for word in ['armor', 'helmet', 'boots', 'gloves', 'suit', 'vest'])):
+        if not categorized and (item_type == 'armor' or ARMOR_KEYWORDS.search(name_lower)):
             categories['armor_clothing'].append(item)
             categorized = True
         
         # Tools
-        if not categorized and (item_type == 'tool' or any(word in name_lower for word in ['drill', 'saw', 'wrench', 'scanner', 'lantern', 'torch', 'radar'])):
+        if not categorized and (item_type == 'tool' or TOOL_KEYWORDS.search(name_lower)):
             categories['tools'].append(item)
             categorized = True
         
         # Consumables - Food
-        if not categorized and any(word in name_lower for word in ['meat', 'fish', 'berry', 'berries', 'bread', 'soup', 'stew', 'cooked', 'raw', 'food']):
+        if not categorized and FOOD_KEYWORDS.search(name_lower):
             categories['consumables_food'].append(item)
             categorized = True
         
         # Consumables - Medicine
-        if not categorized and any(word in name_lower for word in ['medicine', 'bandage', 'paste', 'cure', 'antibiotic', 'syringe']):
+        if not categorized and MEDICINE_KEYWORDS.search(name_lower):
             categories['consumables_medicine'].append(item)
             categorized = True
         
         # Resources - Raw (harvestable)
-        if not categorized and (item_type == 'harvestable' or any(word in name_lower for word in ['ore', 'wood', 'stone', 'fiber', 'hide', 'bone', 'stick'])):
+        if not categorized and (item_type == 'harvestable' or RAW_RESOURCE_KEYWORDS.search(name_lower)):
             if 'ingot' not in name_lower and 'refined' not in name_lower:
                 categories['resources_raw'].append(item)
                 categorized = True
         
         # Resources - Processed
-        if not categorized and any(word in name_lower for word in ['ingot', 'refined', 'leather', 'rope', 'fabric', 'steel', 'iron', 'copper']):
+        if not categorized and PROCESSED_RESOURCE_KEYWORDS.search(name_lower):
             categories['resources_processed'].append(item)
             categorized = True
         
         # Deployables
-        if not categorized and any(word in name_lower for word in ['turret', 'trap', 'beacon', 'mine', 'deployable']):
+        if not categorized and DEPLOYABLE_KEYWORDS.search(name_lower):
             categories['deployables'].append(item)
             categorized = True
         
         # Check category field if still not categorized
         if not categorized:
+            category = item.get('category', '').lower()
             if 'building' in category:
                 categories['building_structures'].append(item)
                 categorized = True
@@ -706,7 +1229,104 @@ def categorize_items(items):
     
     return {k: v for k, v in categories.items() if v}
 
-def scrape_all_items(output_dir="icarus_data", max_workers=5):
+UNSAFE_FILENAME_CHARS = re.compile(r'[^\w\s-]')
+FILENAME_SEPARATORS = re.compile(r'[-\s]+')
+
+def item_filename(name):
+    """Safe per-item file name, e.g. 'Stone Axe' -> 'stone_axe.json'"""
+    safe_name = UNSAFE_FILENAME_CHARS.sub('', name)
+    safe_name = FILENAME_SEPARATORS.sub('_', safe_name).lower()
+    return f"{safe_name}.json"
+
+def save_json(filepath, data):
+    """Write data as indented JSON, skipping the write if the file already matches
+    
+    Re-scrapes mostly reproduce the existing files byte for byte; leaving
+    those untouched saves the disk I/O and keeps their mtimes meaningful.
+    Returns True if the file was written.
+    """
+    
+    # orjson emits UTF-8 bytes directly and its 2-space indent matches
+    # json.dumps(indent=2, ensure_ascii=False) byte for byte, several
+    # times faster on the large collection files
+    return write_if_changed(filepath, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+def write_if_changed(filepath, new_bytes):
+    """write_atomic, unless the file already holds exactly new_bytes
+    
+    Returns True if the file was written.
+    """
+    
+    try:
+        # A size mismatch settles it without reading the old file
+        if os.path.getsize(filepath) == len(new_bytes):
+            with open(filepath, 'rb') as f:
+                if f.read() == new_bytes:
+                    return False
+    except OSError:
+        pass
+    
+    write_atomic(filepath, new_bytes)
+    return True
+
+def save_parquet(filepath, items_by_category):
+    """Write every item as one row of a zstd-compressed Parquet table
+    
+    A columnar copy for analysis: reading e.g. every item's tier touches one
+    column of one file instead of opening thousands of JSON files. Needs
+    polars; returns None when it is not installed, else whether the file
+    was written (it is skipped when unchanged, as in save_json).
+    """
+    
+    try:
+        import polars as pl
+    except ImportError:
+        return None
+    
+    rows = []
+    for category, items in sorted(items_by_category.items()):
+        for item in items:
+            rows.append({
+                "name": item['name'],
+                "url": item.get('url', ''),
+                "description": item.get('description', ''),
+                "item_type": item.get('item_type', 'unknown'),
+                "tier": item.get('tier', 0),
+                "category": category,
+                "wiki_category": item.get('category', ''),
+                "crafted_at": item.get('crafted_at', 'Unknown'),
+                # Ingredient names vary per item, so store them as rows of a list
+                "ingredients": [
+                    {"name": name, "quantity": quantity}
+                    for name, quantity in item.get('ingredients', {}).items()
+                ],
+                "stats": {stat: item.get('stats', {}).get(stat)
+                          for stat in ('damage', 'armor', 'weight', 'durability')},
+                "research_cost": item.get('research_cost'),
+                "purchase_cost": item.get('purchase_cost'),
+            })
+    
+    schema = {
+        "name": pl.Utf8,
+        "url": pl.Utf8,
+        "description": pl.Utf8,
+        "item_type": pl.Utf8,
+        "tier": pl.Int64,
+        "category": pl.Utf8,
+        "wiki_category": pl.Utf8,
+        "crafted_at": pl.Utf8,
+        "ingredients": pl.List(pl.Struct({"name": pl.Utf8, "quantity": pl.Int64})),
+        "stats": pl.Struct({stat: pl.Utf8 for stat in ('damage', 'armor', 'weight', 'durability')}),
+        "research_cost": pl.Int64,
+        "purchase_cost": pl.Int64,
+    }
+    
+    df = pl.DataFrame(rows, schema=schema).sort("name")
+    buffer = io.BytesIO()
+    df.write_parquet(buffer, compression='zstd', statistics=True)
+    return write_if_changed(filepath, buffer.getvalue())
+
+def scrape_all_items(output_dir="icarus_data", max_workers=5, rediscover=False, force=False):
     """Main scraping function"""
     
     print("="*70)
@@ -714,7 +1334,12 @@ def scrape_all_items(output_dir="icarus_data", max_workers=5):
     print("="*70)
     
     # Phase 1: Discover pages
-    item_pages = discover_all_item_pages()
+    os.makedirs(output_dir, exist_ok=True)
+    item_pages = discover_all_item_pages(
+        max_workers=max_workers,
+        cache_path=os.path.join(output_dir, DISCOVERY_CACHE_FILE),
+        refresh=rediscover
+    )
     
     if not item_pages:
         print("\n✗ No pages discovered!")
@@ -726,36 +1351,206 @@ def scrape_all_items(output_dir="icarus_data", max_workers=5):
     print("="*70)
     print(f"\nScraping {len(item_pages)} pages with {max_workers} threads...\n")
     
-    os.makedirs(output_dir, exist_ok=True)
+    # ETag/Last-Modified per page from the previous run, plus the item parsed
+    # from it, so unchanged pages come back as an empty 304 and skip parsing
+    http_cache_path = os.path.join(output_dir, HTTP_CACHE_FILE)
+    http_cache = load_http_cache(http_cache_path)
     
     all_items = []
     completed = 0
     failed = 0
+    not_modified = 0
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_url = {
-            executor.submit(extract_item_data, url, quiet=True): url 
-            for url in item_pages
+    # Several discovered URLs can redirect to one page (category listings
+    # and the main pages link both spellings). Each resolved title is kept
+    # under the first URL that claims it; every other URL for it is skipped,
+    # whether its item is reused, checked or downloaded.
+    page_owner = {}
+    def claim(title, url):
+        return page_owner.setdefault(title, url) == url
+    redirects_skipped = 0
+    
+    # Raw HTML of every page fetched so far, so a changed parser can re-run
+    # over unchanged pages without downloading them again
+    page_cache_path = os.path.join(output_dir, PAGE_CACHE_FILE)
+    page_cache = open_page_cache(page_cache_path)
+    stored_pages = {url for (url,) in page_cache.execute('SELECT url FROM pages')}
+    reparsed = 0
+    
+    # Items a recent run confirmed current are reused as they are, so a
+    # re-run within ITEM_MAX_AGE makes no requests for them at all
+    checked_at = time.time()
+    pages_to_check = []
+    recent_redirects = []
+    for url in item_pages:
+        cached = http_cache.get(url)
+        recent = not force and cached is not None and checked_at - cached.get('checked', 0) < ITEM_MAX_AGE
+        
+        if recent and 'redirect_to' in cached:
+            recent_redirects.append(url)
+        elif not recent or cached.get('parser') != PARSER_VERSION:
+            pages_to_check.append(url)
+        elif claim(page_title(cached['item']['url']), url):
+            all_items.append(cached['item'])
+            completed += 1
+            not_modified += 1
+        else:
+            redirects_skipped += 1
+    
+    # So is a URL recently seen redirecting to one of those items
+    for url in recent_redirects:
+        if http_cache[url]['redirect_to'] not in page_owner:
+            pages_to_check.append(url)
+        else:
+            redirects_skipped += 1
+    
+    # Pages whose wiki timestamp hasn't moved since the last run are reused
+    # without any request (or re-parsed from the page cache if the parser
+    # has changed since); the rest go through the conditional GET below
+    touched, targets = fetch_touched(pages_to_check)
+    pages_to_fetch = []
+    pages_to_reparse = []
+    
+    # A page's own URL goes first, so it is kept rather than a redirect's
+    # when both were discovered
+    for url in sorted(pages_to_check, key=lambda url: page_title(url) != targets.get(url, page_title(url))):
+        if url in targets and not claim(targets[url], url):
+            http_cache[url] = {'redirect_to': targets[url], 'checked': checked_at}
+            redirects_skipped += 1
+            continue
+        
+        cached = http_cache.get(url)
+        parser_current = cached is not None and cached.get('parser') == PARSER_VERSION
+        unchanged = cached is not None and touched.get(url) and cached.get('touched') == touched[url]
+        
+        if unchanged and (parser_current or url in stored_pages):
+            if parser_current:
+                cached['checked'] = checked_at
+                all_items.append(cached['item'])
+                completed += 1
+                not_modified += 1
+            else:
+                pages_to_reparse.append(url)
+        else:
+            # A 304 is only useful while the cached item is still current
+            pages_to_fetch.append((url, cached if parser_current else None))
+    
+    # Downloads run on threads; parsing is CPU-bound and would serialize on
+    # the GIL, so it is handed off to a process pool as each page arrives.
+    # Both kinds of future are collected in one loop, so parsed items reach
+    # the HTTP cache (and its checkpoints) while downloads are still going.
+    # Workers come from a forkserver: forking this process once the fetch
+    # threads are running could copy a lock one of them holds.
+    with ThreadPoolExecutor(max_workers=max_workers) as fetcher, \
+            ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                mp_context=multiprocessing.get_context('forkserver')) as parser:
+        fetch_to_url = {
+            fetcher.submit(fetch_html, url, cached): url 
+            for url, cached in pages_to_fetch
         }
         
-        for future in as_completed(future_to_url):
-            url = future_to_url[future]
-            try:
-                item_data = future.result()
-                if item_data:
-                    all_items.append(item_data)
-                    completed += 1
+        future_to_url = {}
+        page_validators = {}
+        for url in pages_to_reparse:
+            cached = http_cache[url]
+            page_validators[url] = {'etag': cached.get('etag'), 'last_modified': cached.get('last_modified')}
+            future_to_url[parser.submit(parse_cached_page, page_cache_path, url, cached['item']['url'])] = url
+            reparsed += 1
+        
+        total = len(fetch_to_url) + len(future_to_url) + not_modified
+        unsaved = 0
+        pending = set(fetch_to_url) | set(future_to_url)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = future_to_url.get(future)
+                
+                if url is None:
+                    url = fetch_to_url[future]
+                    try:
+                        final_url, html, validators = future.result()
+                    except Exception as e:
+                        if DEBUG:
+                            print(f"\n  [ERROR] {url}: {e}")
+                        failed += 1
+                        
+                        # Keep the last good parse of the page if there is one,
+                        # else an empty record, as extract_item_data does
+                        cached = http_cache.get(url)
+                        item_data = cached['item'] if cached and 'item' in cached else new_item_data(url)
+                        if claim(page_title(item_data['url']), url):
+                            all_items.append(item_data)
+                            completed += 1
+                        else:
+                            redirects_skipped += 1
+                            total -= 1
+                        continue
                     
-                    if completed % 25 == 0 or completed == len(item_pages):
-                        print(f"  Progress: {completed}/{len(item_pages)} ({(completed/len(item_pages)*100):.1f}%)", end='\r')
-                else:
-                    failed += 1
+                    # Redirected to a page another URL already covers
+                    if not claim(page_title(final_url), url):
+                        http_cache[url] = {'redirect_to': page_title(final_url), 'checked': checked_at}
+                        redirects_skipped += 1
+                        total -= 1
+                        continue
                     
-            except Exception as e:
-                print(f"\n  [ERROR] {url}: {e}")
-                failed += 1
+                    if html is None:
+                        # 304 Not Modified: last run's item is still current
+                        http_cache[url]['touched'] = touched.get(url)
+                        http_cache[url]['checked'] = checked_at
+                        all_items.append(http_cache[url]['item'])
+                        completed += 1
+                        not_modified += 1
+                        continue
+                    
+                    store_page(page_cache, url, html)
+                    page_validators[url] = validators
+                    parsed = parser.submit(parse_html, final_url, html)
+                    future_to_url[parsed] = url
+                    pending.add(parsed)
+                    continue
+                
+                try:
+                    item_data = future.result()
+                    if item_data:
+                        all_items.append(item_data)
+                        completed += 1
+                        
+                        # Only pages that were actually fetched, never the empty
+                        # record kept for a failed download
+                        validators = page_validators.get(url)
+                        if validators and (validators['etag'] or validators['last_modified'] or touched.get(url)):
+                            http_cache[url] = {
+                                **validators,
+                                'touched': touched.get(url),
+                                'checked': checked_at,
+                                'parser': PARSER_VERSION,
+                                'item': item_data
+                            }
+                            unsaved += 1
+                        
+                        if completed % 25 == 0 or completed == total:
+                            print(f"  Progress: {completed}/{total} ({(completed/total*100):.1f}%)", end='\r')
+                    else:
+                        failed += 1
+                        
+                except Exception as e:
+                    print(f"\n  [ERROR] {url}: {e}")
+                    failed += 1
+            
+            # Checkpoint, so an interrupted run resumes from here: the next
+            # one finds these items fresh and the pages in the page cache
+            if unsaved >= CHECKPOINT_EVERY:
+                save_http_cache(http_cache_path, http_cache)
+                page_cache.commit()
+                unsaved = 0
+    
+    save_http_cache(http_cache_path, http_cache)
+    page_cache.commit()
+    page_cache.close()
     
-    print(f"\n\n✓ Scraped {completed} items\n")
+    print(f"\n\n✓ Scraped {completed} items ({not_modified} unchanged since last run, "
+          f"{reparsed} re-parsed from the page cache)")
+    print(f"  ({redirects_skipped} redirects to already-scraped pages skipped)\n")
     
     # Categorize and save
     print(f"{'='*70}")
@@ -780,44 +1575,55 @@ def scrape_all_items(output_dir="icarus_data", max_workers=5):
     
     # Save individual item files
     print("\n📄 Saving individual item files...")
-    items_saved = 0
-    
+    # Keyed by path so items that share a filename keep the old
+    # last-one-wins result instead of racing each other on disk.
+    # The master index entries are built in the same pass so each
+    # filename is only derived once.
+    item_files = {}
+    items_index = []
     for category, items in sorted(items_by_category.items()):
         category_dir = os.path.join(output_dir, category)
         
         for item in items:
-            # Create safe filename from item name
-            safe_name = re.sub(r'[^\w\s-]', '', item['name'])
-            safe_name = re.sub(r'[-\s]+', '_', safe_name).lower()
-            filename = f"{safe_name}.json"
-            filepath = os.path.join(category_dir, filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(item, f, indent=2, ensure_ascii=False)
-            
-            items_saved += 1
-        
-        if items_saved % 50 == 0:
-            print(f"  Saved {items_saved}/{len(all_items)} items...", end='\r')
+            filename = item_filename(item['name'])
+            item_files[os.path.join(category_dir, filename)] = item
+            items_index.append({
+                "name": item['name'],
+                "category": category,
+                "file": f"{category}/{filename}",
+                "type": item.get('item_type', 'unknown'),
+                "tier": item.get('tier', 0),
+                "url": item.get('url', '')
+            })
+    
+    # Thousands of small files: the time goes to open/write/close syscalls,
+    # which release the GIL, so a thread pool overlaps them
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as writer:
+        written = list(writer.map(save_json, item_files.keys(), item_files.values()))
+    
+    items_saved = sum(written)
+    items_unchanged = len(written) - items_saved
     
-    print(f"  ✓ Saved {items_saved} individual item files")
+    print(f"  ✓ Saved {items_saved} individual item files ({items_unchanged} unchanged)")
     
     # Save category collection files
     print("\n📦 Saving category collection files...")
-    for category, items in sorted(items_by_category.items()):
-        filepath = os.path.join(output_dir, f"{category}.json")
-        display_name = category.replace('_', ' ').title()
-        
-        data = {
-            "category": display_name,
+    collections = {
+        os.path.join(output_dir, f"{category}.json"): {
+            "category": category.replace('_', ' ').title(),
             "count": len(items),
             "items": sorted(items, key=lambda x: x['name'])
         }
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
-        print(f"  ✓ {category}.json ({len(items)} items)")
+        for category, items in sorted(items_by_category.items())
+    }
+    
+    # Same pool treatment as the item files; results come back in order
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as writer:
+        written = list(writer.map(save_json, collections.keys(), collections.values()))
+    
+    for (category, items), was_written in zip(sorted(items_by_category.items()), written):
+        status = "" if was_written else ", unchanged"
+        print(f"  ✓ {category}.json ({len(items)} items{status})")
     
     # Save master index with metadata only (no full item data)
     print("\n📋 Creating master index...")
@@ -832,37 +1638,27 @@ def scrape_all_items(output_dir="icarus_data", max_workers=5):
             "count": len(items),
             "display_name": category.replace('_', ' ').title()
         }
-        
-        for item in items:
-            safe_name = re.sub(r'[^\w\s-]', '', item['name'])
-            safe_name = re.sub(r'[-\s]+', '_', safe_name).lower()
-            
-            index["items_index"].append({
-                "name": item['name'],
-                "category": category,
-                "file": f"{category}/{safe_name}.json",
-                "type": item.get('item_type', 'unknown'),
-                "tier": item.get('tier', 0),
-                "url": item.get('url', '')
-            })
     
     # Sort index by name
-    index["items_index"] = sorted(index["items_index"], key=lambda x: x['name'])
+    index["items_index"] = sorted(items_index, key=lambda x: x['name'])
     
     index_path = os.path.join(output_dir, "index.json")
-    with open(index_path, 'w', encoding='utf-8') as f:
-        json.dump(index, f, indent=2, ensure_ascii=False)
+    save_json(index_path, index)
     print(f"  ✓ index.json (master index with {len(all_items)} items)")
     
     # Save complete dataset (for backwards compatibility)
     complete_filepath = os.path.join(output_dir, "all_items.json")
-    with open(complete_filepath, 'w', encoding='utf-8') as f:
-        json.dump({
-            "total_items": len(all_items),
-            "items": sorted(all_items, key=lambda x: x['name'])
-        }, f, indent=2, ensure_ascii=False)
+    save_json(complete_filepath, {
+        "total_items": len(all_items),
+        "items": sorted(all_items, key=lambda x: x['name'])
+    })
     print(f"  ✓ all_items.json (complete dataset)")
     
+    if save_parquet(os.path.join(output_dir, "items.parquet"), items_by_category) is None:
+        print(f"  ℹ️  polars not installed - skipping items.parquet")
+    else:
+        print(f"  ✓ items.parquet (columnar dataset)")
+    
     # Summary
     summary = {
         "total_items": len(all_items),
@@ -877,8 +1673,7 @@ def scrape_all_items(output_dir="icarus_data", max_workers=5):
         }
     }
     
-    with open(os.path.join(output_dir, "_summary.json"), 'w') as f:
-        json.dump(summary, f, indent=2)
+    save_json(os.path.join(output_dir, "_summary.json"), summary)
     print(f"  ✓ _summary.json")
     
     print(f"\n{'='*70}")
@@ -913,7 +1708,26 @@ if __name__ == "__main__":
         except EOFError:
             confirm = "yes"  # Default to yes if running non-interactively
 
+    # --workers N sets the number of concurrent requests (default 5)
+    max_workers = 5
+    if "--workers" in sys.argv:
+        max_workers = int(sys.argv[sys.argv.index("--workers") + 1])
+
+    # --rate R caps requests per second across all workers (default 5);
+    # with keep-alive connections this, not the worker count, bounds throughput
+    if "--rate" in sys.argv:
+        rate = float(sys.argv[sys.argv.index("--rate") + 1])
+        if not rate > 0:
+            sys.exit(f"--rate must be greater than 0 (got {rate:g})")
+        RATE_LIMITER.set_rate(rate)
+
     if confirm == "yes":
-        scrape_all_items(max_workers=5)
+        # --force re-checks every page instead of trusting items confirmed
+        # current within the last ITEM_MAX_AGE
+        scrape_all_items(
+            max_workers=max_workers,
+            rediscover="--rediscover" in sys.argv,
+            force="--force" in sys.argv
+        )
     else:
         print("Aborted.")
\ No newline at end of file
@@ -2,11 +2,42 @@
 """
 Improved bundler that creates both a master bundle and category-specific files
 that match what the HTML expects
+
+Installation:
+pip install orjson
+pip install msgpack   # optional, adds icarus_data/recipes_bundle.msgpack
 """
 
-import json
+import gzip
+import heapq
+import os
+from operator import itemgetter
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+
+def find_item_files(data_dir):
+    """Category folders and every (category, item file) pair beneath them
+    
+    os.scandir returns each entry's type along with its name, so there is
+    no per-file stat; all paths are gathered up front, across categories.
+    """
+    
+    subdirs = [entry for entry in os.scandir(data_dir) if entry.is_dir()]
+    
+    item_files = []
+    for subdir in subdirs:
+        for entry in os.scandir(subdir.path):
+            if entry.name.endswith('.json') and not entry.name.startswith('.') and entry.is_file():
+                item_files.append((subdir.name, Path(entry.path)))
+    
+    return subdirs, item_files
+
+def write_json(path, data):
+    """Write data as indented JSON (orjson's indent matches json.dump(indent=2))"""
+    path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
 def build_bundles():
     """Create both master bundle and category-specific JSON files"""
@@ -20,29 +51,30 @@ def build_bundles():
     all_recipes = {}
     items_by_category = defaultdict(list)
     
-    # Get all subdirectories (armor_clothing, weapons_melee, etc.)
-    subdirs = [d for d in data_dir.iterdir() if d.is_dir()]
+    # Subdirectories (armor_clothing, weapons_melee, etc.) and their item files
+    subdirs, item_files = find_item_files(data_dir)
     
-    total_files = 0
-    for subdir in subdirs:
-        json_files = list(subdir.glob("*.json"))
-        
-        for json_file in json_files:
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    item_data = json.load(f)
+    loaded = []
+    for category, json_file in item_files:
+        try:
+            item_data = orjson.loads(json_file.read_bytes())
+            
+            item_name = item_data.get("name")
+            if item_name:
+                all_recipes[item_name] = item_data
+                loaded.append((category, item_data))
                 
-                item_name = item_data.get("name")
-                if item_name:
-                    all_recipes[item_name] = item_data
-                    total_files += 1
-                    
-                    # Group by scraped category folder name
-                    category = subdir.name
-                    items_by_category[category].append(item_data)
-                    
-            except Exception as e:
-                print(f"⚠️  Error loading {json_file}: {e}")
+        except Exception as e:
+            print(f"⚠️  Error loading {json_file}: {e}")
+    
+    total_files = len(loaded)
+    
+    # Group by scraped category folder name after one stable sort by name,
+    # so every category list is already in name order
+    by_name = itemgetter('name')
+    loaded.sort(key=lambda pair: by_name(pair[1]))
+    for category, item_data in loaded:
+        items_by_category[category].append(item_data)
     
     print(f"✅ Loaded {total_files} items from {len(subdirs)} categories")
     
@@ -78,39 +110,57 @@ def build_bundles():
     
     html_categories = {}
     for html_cat, scraped_cats in category_mapping.items():
-        combined_items = []
-        for scraped_cat in scraped_cats:
-            if scraped_cat in items_by_category:
-                combined_items.extend(items_by_category[scraped_cat])
+        # Merging the name-sorted lists keeps ties in mapping order, the same
+        # result as sorting their concatenation
+        combined_items = list(heapq.merge(
+            *(items_by_category[scraped_cat] for scraped_cat in scraped_cats if scraped_cat in items_by_category),
+            key=by_name
+        ))
         
         if combined_items:
             html_categories[html_cat] = {
                 "category": html_cat.replace('_', ' ').title(),
                 "count": len(combined_items),
-                "items": sorted(combined_items, key=lambda x: x['name'])
+                "items": combined_items
             }
-            
-            # Write individual category file
-            category_file = data_dir / f"{html_cat}.json"
-            with open(category_file, 'w', encoding='utf-8') as f:
-                json.dump(html_categories[html_cat], f, indent=2, ensure_ascii=False)
-            
-            print(f"  ✅ {html_cat}.json ({len(combined_items)} items)")
+    
+    # Thread-pooled writes, as for the scraper's item files
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as writer:
+        list(writer.map(
+            write_json,
+            [data_dir / f"{html_cat}.json" for html_cat in html_categories],
+            html_categories.values()
+        ))
+    
+    for html_cat, data in html_categories.items():
+        print(f"  ✅ {html_cat}.json ({data['count']} items)")
     
     # Step 4: Create master bundle (all recipes in one file)
     print(f"\n📦 Creating master bundle...")
     bundle_file = data_dir / "recipes_bundle.json"
     
-    with open(bundle_file, 'w', encoding='utf-8') as f:
-        json.dump(all_recipes, f, separators=(',', ':'))  # Minified
+    bundle_bytes = orjson.dumps(all_recipes)  # Minified, UTF-8
+    bundle_file.write_bytes(bundle_bytes)
     
-    bundle_size = bundle_file.stat().st_size
+    bundle_size = len(bundle_bytes)
     bundle_size_mb = bundle_size / (1024 * 1024)
     
     print(f"  ✅ recipes_bundle.json")
     print(f"  📊 Size: {bundle_size_mb:.2f} MB ({bundle_size:,} bytes)")
     print(f"  📝 Recipes: {len(all_recipes)}")
     
+    # Binary copy of the bundle for Python tooling: smaller than the JSON
+    # and much faster to decode
+    try:
+        import msgpack
+        msgpack_file = data_dir / "recipes_bundle.msgpack"
+        msgpack_bytes = msgpack.packb(all_recipes, use_bin_type=True)
+        msgpack_file.write_bytes(msgpack_bytes)
+        
+        print(f"  ✅ recipes_bundle.msgpack ({len(msgpack_bytes):,} bytes)")
+    except ImportError:
+        print("  ℹ️  msgpack not installed - skipping recipes_bundle.msgpack")
+    
     # Step 5: Create index file
     print(f"\n📋 Creating index...")
     index = {
@@ -119,46 +169,45 @@ def build_bundles():
         "items_index": []
     }
     
+    category_indexes = []
     for category, data in html_categories.items():
         index["categories"][category] = {
             "count": data["count"],
             "display_name": data["category"]
         }
         
-        for item in data["items"]:
-            index["items_index"].append({
+        category_indexes.append([
+            {
                 "name": item['name'],
                 "category": category,
                 "type": item.get('item_type', 'unknown'),
                 "tier": item.get('tier', 0),
                 "crafted_at": item.get('crafted_at', 'Unknown')
-            })
+            }
+            for item in data["items"]
+        ])
     
-    index["items_index"] = sorted(index["items_index"], key=lambda x: x['name'])
+    # Each category's entries are already in name order
+    index["items_index"] = list(heapq.merge(*category_indexes, key=by_name))
     
-    index_file = data_dir / "index.json"
-    with open(index_file, 'w', encoding='utf-8') as f:
-        json.dump(index, f, indent=2, ensure_ascii=False)
+    write_json(data_dir / "index.json", index)
     
     print(f"  ✅ index.json")
     
-    # Step 6: Compress bundle
-    try:
-        import gzip
-        compressed_file = data_dir / "recipes_bundle.json.gz"
-        with open(bundle_file, 'rb') as f_in:
-            with gzip.open(compressed_file, 'wb', compresslevel=9) as f_out:
-                f_out.writelines(f_in)
-        
-        compressed_size = compressed_file.stat().st_size
-        compressed_size_mb = compressed_size / (1024 * 1024)
-        compression_ratio = (1 - compressed_size / bundle_size) * 100
-        
-        print(f"\n🗜️  Compressed bundle created")
-        print(f"  📊 Size: {compressed_size_mb:.2f} MB ({compressed_size:,} bytes)")
-        print(f"  💾 Compression: {compression_ratio:.1f}% smaller")
-    except ImportError:
-        print("\nℹ️  gzip not available - skipping compression")
+    # Step 6: Compress bundle, from the bytes already in memory rather than
+    # reading the file back; mtime=0 keeps the archive byte-identical when
+    # the bundle itself hasn't changed
+    compressed_file = data_dir / "recipes_bundle.json.gz"
+    compressed_bytes = gzip.compress(bundle_bytes, compresslevel=9, mtime=0)
+    compressed_file.write_bytes(compressed_bytes)
+    
+    compressed_size = len(compressed_bytes)
+    compressed_size_mb = compressed_size / (1024 * 1024)
+    compression_ratio = (1 - compressed_size / bundle_size) * 100
+    
+    print(f"\n🗜️  Compressed bundle created")
+    print(f"  📊 Size: {compressed_size_mb:.2f} MB ({compressed_size:,} bytes)")
+    print(f"  💾 Compression: {compression_ratio:.1f}% smaller")
     
     # Summary
     print(f"\n{'='*60}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scraper is a top-level script, not an installed package
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
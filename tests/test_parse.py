@@ -0,0 +1,41 @@
+"""Parser regression tests; no network access"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import RecipeScraping
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+@pytest.mark.parametrize("page", sorted(path.stem for path in FIXTURES.glob("*.html")))
+def test_parse_html_matches_expected_output(page):
+    html = (FIXTURES / f"{page}.html").read_bytes()
+    expected = json.loads((FIXTURES / f"{page}.json").read_text(encoding="utf-8"))
+    assert RecipeScraping.parse_html(f"{RecipeScraping.BASE_URL}/wiki/{page}", html) == expected
+
+def test_station_phrase_priority_survives_rejected_earlier_match():
+    # 'Crafted in ...' matches first but is too long to be a station name;
+    # the 'Station:' phrase inside it must still be found
+    text = "Crafted in a long sequence of steps that eventually end at the Station: Crafting Bench"
+    ingredients, crafted_at = RecipeScraping.parse_crafting_table([], None, None, text)
+    assert ingredients == {}
+    assert crafted_at == "Crafting Bench"
+
+def test_crafted_at_beats_earlier_station_phrase():
+    text = "Station: Fabricator\nCrafted at: Machining Bench"
+    assert RecipeScraping.parse_crafting_table([], None, None, text)[1] == "Machining Bench"
+
+def test_footer_class_in_inline_script_does_not_truncate_page():
+    html = (FIXTURES / "Stone_Furnace.html").read_bytes().replace(
+        b"</title>", b"</title><script>var tpl = '<div class=\"global-footer\">';</script>", 1
+    )
+    expected = json.loads((FIXTURES / "Stone_Furnace.json").read_text(encoding="utf-8"))
+    assert RecipeScraping.parse_html(f"{RecipeScraping.BASE_URL}/wiki/Stone_Furnace", html) == expected
+
+def test_global_footer_is_cut_only_after_content():
+    page = b'<html><body><div class="mw-parser-output"><p>x</p></div><footer class="global-footer wide"></footer></body></html>'
+    assert page[RecipeScraping.global_footer_start(page):].startswith(b'<footer')
+    assert RecipeScraping.global_footer_start(b'<footer class="global-footer"></footer><div class="mw-parser-output"></div>') is None
+    assert RecipeScraping.global_footer_start(b'<div class="mw-parser-output"></div>') is None
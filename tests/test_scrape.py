@@ -0,0 +1,93 @@
+"""scrape_all_items against a fake wiki; no network access"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import RecipeScraping
+
+FIXTURES = Path(__file__).parent / "fixtures"
+IRON_PICKAXE = f"{RecipeScraping.BASE_URL}/wiki/Iron_Pickaxe"
+OLD_PICK = f"{RecipeScraping.BASE_URL}/wiki/Old_Pick"
+
+class FakeResponse:
+    def __init__(self, url, status_code=200, body=b"", data=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = {'ETag': '"v1"'} if body else {}
+        self.body = body
+        self.data = data
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def raise_for_status(self):
+        pass
+    
+    def json(self):
+        return self.data
+    
+    def iter_content(self, chunk_size):
+        yield self.body
+
+class FakeWiki:
+    """Iron_Pickaxe is a page; Old_Pick redirects to it"""
+    
+    def __init__(self):
+        self.requests = []
+        self.broken = set()
+        self.touched = '2024-01-01T00:00:00Z'
+    
+    def get(self, url, params=None, headers=None, **kwargs):
+        if url == RecipeScraping.API_URL:
+            titles = params['titles'].split('|')
+            self.requests.append(('api', tuple(sorted(titles))))
+            return FakeResponse(url, data={'query': {
+                'redirects': [{'from': 'Old Pick', 'to': 'Iron Pickaxe'}] if 'Old Pick' in titles else [],
+                'pages': [{'title': 'Iron Pickaxe', 'touched': self.touched}]
+            }})
+        
+        self.requests.append(('get', url))
+        if url in self.broken:
+            raise RecipeScraping.requests.ConnectionError("connection reset")
+        if headers and headers.get('If-None-Match') == '"v1"':
+            return FakeResponse(IRON_PICKAXE, status_code=304)
+        return FakeResponse(IRON_PICKAXE, body=(FIXTURES / "Iron_Pickaxe.html").read_bytes())
+
+@pytest.fixture
+def wiki(monkeypatch):
+    fake = FakeWiki()
+    monkeypatch.setattr(RecipeScraping.SESSION, 'get', fake.get)
+    monkeypatch.setattr(RecipeScraping, 'discover_all_item_pages', lambda **kwargs: [OLD_PICK, IRON_PICKAXE])
+    return fake
+
+def scraped_items(output_dir):
+    return json.loads((output_dir / "all_items.json").read_text(encoding="utf-8"))["items"]
+
+def test_redirect_to_reused_item_makes_no_request(wiki, tmp_path):
+    RecipeScraping.scrape_all_items(output_dir=str(tmp_path), max_workers=2)
+    assert ('get', OLD_PICK) not in wiki.requests
+    assert [item["url"] for item in scraped_items(tmp_path)] == [IRON_PICKAXE]
+    
+    # Inside ITEM_MAX_AGE the item is reused, and the redirect with it
+    wiki.requests.clear()
+    RecipeScraping.scrape_all_items(output_dir=str(tmp_path), max_workers=2)
+    assert wiki.requests == []
+    assert [item["url"] for item in scraped_items(tmp_path)] == [IRON_PICKAXE]
+
+def test_failed_download_keeps_cached_item(wiki, tmp_path):
+    RecipeScraping.scrape_all_items(output_dir=str(tmp_path), max_workers=2)
+    
+    # The page was edited since, but downloading it fails
+    wiki.touched = '2024-02-01T00:00:00Z'
+    wiki.broken.add(IRON_PICKAXE)
+    RecipeScraping.scrape_all_items(output_dir=str(tmp_path), max_workers=2, force=True)
+    assert ('get', IRON_PICKAXE) in wiki.requests
+    [item] = scraped_items(tmp_path)
+    assert item["url"] == IRON_PICKAXE and item["ingredients"]
+    summary = json.loads((tmp_path / "_summary.json").read_text(encoding="utf-8"))
+    assert summary["failed_items"] == 1
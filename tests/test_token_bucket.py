@@ -0,0 +1,18 @@
+"""TokenBucket configuration tests"""
+
+import pytest
+
+from RecipeScraping import TokenBucket
+
+def test_set_rate_updates_rate_and_burst():
+    bucket = TokenBucket(rate=5, capacity=10)
+    bucket.set_rate(2)
+    assert (bucket.rate, bucket.capacity) == (2, 4)
+    assert bucket.tokens == 4
+
+@pytest.mark.parametrize("rate", [0, -1, float("nan")])
+def test_set_rate_rejects_non_positive_rates(rate):
+    bucket = TokenBucket(rate=5, capacity=10)
+    with pytest.raises(ValueError):
+        bucket.set_rate(rate)
+    assert bucket.rate == 5